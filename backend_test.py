@@ -1,65 +1,249 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import concurrent.futures
+import threading
+import logging
 import sys
+import time
 import os
 import io
+import base64
+import gzip
+import tempfile
 from PIL import Image
 import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from requests_toolbelt import MultipartEncoder
+except ImportError:
+    MultipartEncoder = None
+
+# Payloads are precomputed constants so parallel workers share one
+# immutable buffer and only pay for a cheap BytesIO view per test
+_INVALID_PAYLOAD = b"This is not an image file"
+
+class _LargeBlockAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections send bodies in 64 KB blocks.
+
+    http.client defaults to 8 KB blocks, one write syscall (and TLS
+    record) per block; 64 KB blocks cut that count 8x on the upload
+    tests. The kwarg travels PoolManager -> connection pool -> the
+    underlying HTTPConnection, which is the only place it takes effect
+    (instances always set self.blocksize, so patching the class
+    attribute would be shadowed).
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['blocksize'] = 64 * 1024
+        super().init_poolmanager(*args, **kwargs)
+
+
+class _PreparedBody(io.BytesIO):
+    """A pre-assembled request body that carries its own Content-Type."""
+
+    def __init__(self, data, content_type):
+        super().__init__(data)
+        self.content_type = content_type
+
+
+# Canned 1x1 white baseline JPEG (283 bytes). The scan tests only need
+# bytes the server accepts as JPEG, so shipping a pre-encoded blob skips
+# the libjpeg encode entirely and keeps the upload tiny
+_TINY_JPEG = base64.b64decode(
+    b"/9j/4AAQSkZJRgABAQEASABIAAD/2wBDAAEBAQEBAQEBAQEBAQEBAQEBAQEBAQEB"
+    b"AQEBAQEBAQEBAQEBAQEBAQEBAQEBAQEBAQEBAQEBAQEBAQEBAQEBAQH/2wBDAQEB"
+    b"AQEBAQEBAQEBAQEBAQEBAQEBAQEBAQEBAQEBAQEBAQEBAQEBAQEBAQEBAQEBAQEB"
+    b"AQEBAQEBAQEBAQEBAQH/wAARCAABAAEDASIAAhEBAxEB/8QAFAABAAAAAAAAAAAA"
+    b"AAAAAAAACv/EABQQAQAAAAAAAAAAAAAAAAAAAAD/xAAUAQEAAAAAAAAAAAAAAAAA"
+    b"AAAA/8QAFBEBAAAAAAAAAAAAAAAAAAAAAP/aAAwDAQACEQMRAD8AfwD/2Q=="
+)
 from datetime import datetime
 
+# A single buffered logger replaces per-line print(): with the tests
+# running concurrently, print() contends on the stdout lock and issues a
+# write syscall per line
+log = logging.getLogger('healthscanner')
+
 class HealthScannerAPITester:
+    _JSON_HEADERS = {'Content-Type': 'application/json'}
+
     def __init__(self, base_url="https://ingredient-lens.preview.emergentagent.com"):
         #http://localhost:300
         #https://ingredient-lens.preview.emergentagent.com
         self.base_url = base_url
         self.tests_run = 0
         self.tests_passed = 0
+        self._lock = threading.Lock()
+        self._urls = {}
+
+        # Reuse one session so urllib3 keeps the socket open between tests
+        # instead of paying a fresh TCP+TLS handshake per request. HTTP/1.1
+        # keep-alive can't multiplex like HTTP/2, but with only six requests
+        # the pool amortizes the handshakes just as well without pulling in
+        # another HTTP client
+        self.session = requests.Session()
+        self.session.headers.update({'Connection': 'keep-alive'})
+        # Every request goes to one host, so a single-entry pool pinned on
+        # the base URL prefix short-circuits urllib3's pool-map lookup on
+        # each call (the generic https:// mount stays as a fallback)
+        adapter = _LargeBlockAdapter(
+            pool_connections=1,
+            pool_maxsize=10,
+            max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount(self.base_url, adapter)
+
+        # Prime DNS + TLS with a throwaway HEAD so the first timed test
+        # pulls a hot socket from the pool instead of paying the handshake
+        try:
+            self.session.head(self.base_url, timeout=5)
+        except requests.RequestException:
+            pass
 
-    def run_test(self, name, method, endpoint, expected_status, data=None, files=None):
+        # Write the large payload to disk once so the upload test can
+        # stream it from a file handle instead of buffering it in memory
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as tmp:
+            Image.new('RGB', (1000, 1000), color='red').save(tmp, format='JPEG', quality=100)
+            self._large_jpeg_path = tmp.name
+
+    def close(self):
+        """Release the pooled session and the on-disk large payload"""
+        self.session.close()
+        try:
+            os.unlink(self._large_jpeg_path)
+        except OSError:
+            pass
+
+    def run_test(self, name, method, endpoint, expected_status, data=None, files=None, headers=None):
         """Run a single API test"""
-        url = f"{self.base_url}/{endpoint}"
-        headers = {}
-        
-        self.tests_run += 1
-        print(f"\n🔍 Testing {name}...")
-        print(f"   URL: {url}")
+        # Memoize per-endpoint URLs so the hot loop skips the f-string
+        # build once tests repeat at scale
+        url = self._urls.setdefault(endpoint, f"{self.base_url}/{endpoint}")
+
+        with self._lock:
+            self.tests_run += 1
+        log.info(f"\n🔍 Testing {name}...")
+        log.info(f"   URL: {url}")
         
         try:
             if method == 'GET':
-                response = requests.get(url, headers=headers, timeout=30)
+                response = self.session.get(url, headers=headers, timeout=30)
             elif method == 'POST':
-                if files:
-                    response = requests.post(url, files=files, timeout=30)
+                if files is not None:
+                    if hasattr(files, 'content_type'):
+                        # MultipartEncoder streams the body chunk-by-chunk
+                        # instead of buffering it before send
+                        hdrs = dict(headers) if headers else {}
+                        hdrs['Content-Type'] = files.content_type
+                        response = self.session.post(url, data=files, headers=hdrs, timeout=30)
+                    else:
+                        response = self.session.post(url, files=files, headers=headers, timeout=30)
                 else:
-                    headers['Content-Type'] = 'application/json'
-                    response = requests.post(url, json=data, headers=headers, timeout=30)
+                    hdrs = {**self._JSON_HEADERS, **headers} if headers else self._JSON_HEADERS
+                    response = self.session.post(url, json=data, headers=hdrs, timeout=30)
 
             success = response.status_code == expected_status
-            if success:
-                self.tests_passed += 1
-                print(f"✅ Passed - Status: {response.status_code}")
+            if not success:
+                log.error(f"❌ Failed - Expected {expected_status}, got {response.status_code}")
+                # Only 200 chars matter on failure: slice the raw bytes
+                # before decoding instead of decoding a whole error page
+                snippet = response.content[:200].decode('utf-8', 'replace')
+                log.info(f"   Response: {snippet}...")
+                return success, snippet
+
+            # Decode the body once; it is reused for both logging and the
+            # return value instead of re-parsing the JSON per consumer
+            ctype = response.headers.get('content-type', '')
+            if ctype.startswith('application/json'):
                 try:
-                    response_data = response.json()
-                    print(f"   Response keys: {list(response_data.keys()) if isinstance(response_data, dict) else 'Non-dict response'}")
-                except:
-                    print(f"   Response: {response.text[:100]}...")
+                    # orjson decodes the raw bytes directly, skipping the
+                    # utf-8 decode + stdlib json.loads pipeline; matters for
+                    # the OCR-heavy scan responses
+                    if orjson is not None:
+                        payload = orjson.loads(response.content)
+                    else:
+                        payload = response.json()
+                except ValueError:
+                    payload = response.text
+            else:
+                payload = response.text
+
+            with self._lock:
+                self.tests_passed += 1
+            log.info(f"✅ Passed - Status: {response.status_code}")
+            if isinstance(payload, str):
+                log.info(f"   Response: {payload[:100]}...")
             else:
-                print(f"❌ Failed - Expected {expected_status}, got {response.status_code}")
-                print(f"   Response: {response.text[:200]}...")
+                log.info(f"   Response keys: {list(payload.keys()) if isinstance(payload, dict) else 'Non-dict response'}")
 
-            return success, response.json() if response.headers.get('content-type', '').startswith('application/json') else response.text
+            return success, payload
 
         except Exception as e:
-            print(f"❌ Failed - Error: {str(e)}")
+            log.error(f"❌ Failed - Error: {str(e)}")
             return False, {}
 
+    def _jpeg_stream(self, payload=_TINY_JPEG):
+        """Fresh one-shot stream over a shared immutable JPEG payload.
+
+        BytesIO over existing bytes is a cheap view in CPython, so N
+        concurrent upload tests share one underlying buffer instead of
+        re-encoding or copying the payload per worker.
+        """
+        return io.BytesIO(payload)
+
     def create_test_image(self):
         """Create a test image file for upload"""
-        # Create a simple test image
-        img = Image.new('RGB', (300, 200), color='white')
-        img_bytes = io.BytesIO()
-        img.save(img_bytes, format='JPEG')
-        img_bytes.seek(0)
-        return img_bytes
+        return self._jpeg_stream()
+
+    def _multipart(self, filename, fileobj, content_type):
+        """Build an upload body for the scan endpoint.
+
+        The API only accepts multipart (file field), so a raw `data=` body
+        is not an option; MultipartEncoder at least streams the multipart
+        body from the file object instead of buffering it first.
+        """
+        if MultipartEncoder is not None:
+            return MultipartEncoder(fields={'file': (filename, fileobj, content_type)})
+        return {'file': (filename, fileobj, content_type)}
+
+    def run_scan_load(self, count, concurrency=10):
+        """Drive `count` scan uploads for load testing, returning successes.
+
+        A bounded executor issues the next upload the moment one
+        completes, so the pooled sockets stay saturated instead of
+        draining between fixed-size batches. Bypasses run_test's
+        per-request logging to keep the hot loop lean.
+        """
+        url = self._urls.setdefault('api/scan', f"{self.base_url}/api/scan")
+
+        def one_scan():
+            files = self._multipart('test_label.jpg', self._jpeg_stream(), 'image/jpeg')
+            if hasattr(files, 'content_type'):
+                response = self.session.post(
+                    url, data=files,
+                    headers={'Content-Type': files.content_type},
+                    timeout=30
+                )
+            else:
+                response = self.session.post(url, files=files, timeout=30)
+            return response.status_code == 200
+
+        succeeded = 0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(one_scan) for _ in range(count)]
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    succeeded += future.result()
+                except requests.RequestException as e:
+                    log.error(f"❌ Scan upload failed: {str(e)}")
+        return succeeded
 
     def test_health_check(self):
         """Test the root health check endpoint"""
@@ -82,11 +266,11 @@ class HealthScannerAPITester:
         
         if success and isinstance(response, dict):
             ingredients = response.get('ingredients', [])
-            print(f"   Found {len(ingredients)} ingredients")
+            log.info(f"   Found {len(ingredients)} ingredients")
             if ingredients:
                 sample_ingredient = ingredients[0]
-                print(f"   Sample ingredient: {sample_ingredient.get('name', 'Unknown')}")
-                print(f"   Risk level: {sample_ingredient.get('risk_level', 'Unknown')}")
+                log.info(f"   Sample ingredient: {sample_ingredient.get('name', 'Unknown')}")
+                log.info(f"   Risk level: {sample_ingredient.get('risk_level', 'Unknown')}")
         
         return success
 
@@ -101,21 +285,18 @@ class HealthScannerAPITester:
         
         if success and isinstance(response, dict):
             scans = response.get('scans', [])
-            print(f"   Found {len(scans)} scans in history")
+            log.info(f"   Found {len(scans)} scans in history")
         
         return success
 
     def test_scan_image(self):
         """Test scanning an image"""
-        print("\n🔍 Testing Image Scan...")
+        log.info("\n🔍 Testing Image Scan...")
         
         # Create test image
-        test_image = self.create_test_image()
-        
-        files = {
-            'file': ('test_label.jpg', test_image, 'image/jpeg')
-        }
-        
+        files = self._multipart('test_label.jpg', self.create_test_image(), 'image/jpeg')
+
+
         success, response = self.run_test(
             "Scan Food Label Image",
             "POST",
@@ -125,44 +306,40 @@ class HealthScannerAPITester:
         )
         
         if success and isinstance(response, dict):
-            print(f"   Scan ID: {response.get('scan_id', 'Unknown')}")
-            print(f"   Processing time: {response.get('processing_time', 0):.2f}s")
+            log.info(f"   Scan ID: {response.get('scan_id', 'Unknown')}")
+            log.info(f"   Processing time: {response.get('processing_time', 0):.2f}s")
             
             ingredients = response.get('parsed_ingredients', [])
-            print(f"   Found {len(ingredients)} ingredients:")
+            log.info(f"   Found {len(ingredients)} ingredients:")
             
             risk_counts = {'safe': 0, 'caution': 0, 'banned': 0}
             for ingredient in ingredients:
                 risk_level = ingredient.get('risk_level', 'unknown')
                 if risk_level in risk_counts:
                     risk_counts[risk_level] += 1
-                print(f"     - {ingredient.get('name', 'Unknown')}: {risk_level}")
+                log.info(f"     - {ingredient.get('name', 'Unknown')}: {risk_level}")
             
-            print(f"   Risk distribution: Safe={risk_counts['safe']}, Caution={risk_counts['caution']}, Banned={risk_counts['banned']}")
+            log.info(f"   Risk distribution: Safe={risk_counts['safe']}, Caution={risk_counts['caution']}, Banned={risk_counts['banned']}")
             
             # Check nutritional info
             nutritional_info = response.get('nutritional_info', {})
             if nutritional_info:
-                print(f"   Nutritional info found: {list(nutritional_info.keys())}")
+                log.info(f"   Nutritional info found: {list(nutritional_info.keys())}")
             
             # Check OCR text
             ocr_text = response.get('ocr_text', '')
             if ocr_text:
-                print(f"   OCR text length: {len(ocr_text)} characters")
-                print(f"   OCR preview: {ocr_text[:100]}...")
+                log.info(f"   OCR text length: {len(ocr_text)} characters")
+                log.info(f"   OCR preview: {ocr_text[:100]}...")
         
         return success
 
     def test_invalid_file_upload(self):
         """Test uploading invalid file"""
-        print("\n🔍 Testing Invalid File Upload...")
+        log.info("\n🔍 Testing Invalid File Upload...")
         
-        # Create a text file instead of image
-        text_content = io.BytesIO(b"This is not an image file")
-        
-        files = {
-            'file': ('test.txt', text_content, 'text/plain')
-        }
+        # Send a text file instead of an image
+        files = self._multipart('test.txt', io.BytesIO(_INVALID_PAYLOAD), 'text/plain')
         
         success, response = self.run_test(
             "Invalid File Upload",
@@ -176,38 +353,63 @@ class HealthScannerAPITester:
 
     def test_large_file_upload(self):
         """Test uploading file that's too large"""
-        print("\n🔍 Testing Large File Upload...")
-        
-        # Create a large image (simulate > 10MB)
-        # We'll create a smaller one but test the logic
-        large_img = Image.new('RGB', (1000, 1000), color='red')
-        img_bytes = io.BytesIO()
-        large_img.save(img_bytes, format='JPEG', quality=100)
-        img_bytes.seek(0)
-        
-        files = {
-            'file': ('large_test.jpg', img_bytes, 'image/jpeg')
-        }
-        
-        # This should pass since our test image isn't actually > 10MB
-        # But it tests the upload functionality with larger files
-        success, response = self.run_test(
-            "Large File Upload",
-            "POST",
-            "api/scan",
-            200,  # Should succeed with our test image
-            files=files
-        )
+        log.info("\n🔍 Testing Large File Upload...")
         
+        # Stream the pre-encoded large image (simulate > 10MB) straight
+        # from disk so requests never materializes the body in memory
+        headers = None
+        with open(self._large_jpeg_path, 'rb') as fh:
+            if os.environ.get('NEUTRICHECK_GZIP_UPLOAD') == '1' and MultipartEncoder is not None:
+                # Opt-in: gzip the multipart body on the wire (level 1 keeps
+                # CPU cost near zero). Only valid against deployments with
+                # request-inflate middleware, hence the env-var gate
+                encoder = self._multipart('large_test.jpg', fh, 'image/jpeg')
+                files = _PreparedBody(
+                    gzip.compress(encoder.to_string(), compresslevel=1),
+                    encoder.content_type
+                )
+                headers = {'Content-Encoding': 'gzip'}
+            else:
+                files = self._multipart('large_test.jpg', fh, 'image/jpeg')
+
+            # This should pass since our test image isn't actually > 10MB
+            # But it tests the upload functionality with larger files
+            success, response = self.run_test(
+                "Large File Upload",
+                "POST",
+                "api/scan",
+                200,  # Should succeed with our test image
+                files=files,
+                headers=headers
+            )
+
         return success
 
 def main():
-    print("🚀 Starting Health Awareness Label Scanner API Tests")
-    print("=" * 60)
-    
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    # Load mode: backend_test.py --load N drives N concurrent scan
+    # uploads against /api/scan instead of the functional test batch
+    if len(sys.argv) > 1 and sys.argv[1] == '--load':
+        count = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+        log.info(f"🚀 Driving {count} concurrent scan uploads")
+        tester = HealthScannerAPITester()
+        try:
+            start = time.monotonic()
+            succeeded = tester.run_scan_load(count)
+            elapsed = time.monotonic() - start
+        finally:
+            tester.close()
+        log.info(f"📊 {succeeded}/{count} scans succeeded in {elapsed:.1f}s "
+                 f"({count / elapsed:.1f} req/s)")
+        return 0 if succeeded == count else 1
+
+    log.info("🚀 Starting Health Awareness Label Scanner API Tests")
+    log.info("=" * 60)
+
     # Setup
     tester = HealthScannerAPITester()
-    
+
     # Run all tests
     tests = [
         tester.test_health_check,
@@ -218,22 +420,31 @@ def main():
         tester.test_large_file_upload,
     ]
     
-    for test in tests:
-        try:
-            test()
-        except Exception as e:
-            print(f"❌ Test failed with exception: {str(e)}")
-            tester.tests_run += 1
+    # Tests are independent network calls: run them concurrently so they
+    # overlap on the session's keep-alive connection pool instead of
+    # summing RTTs; one worker per test keeps every request in flight
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(tests)) as executor:
+            futures = [executor.submit(test) for test in tests]
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    log.error(f"❌ Test failed with exception: {str(e)}")
+                    with tester._lock:
+                        tester.tests_run += 1
+    finally:
+        tester.close()
+
+    # Log final results
+    log.info("\n" + "=" * 60)
+    log.info(f"📊 Final Results: {tester.tests_passed}/{tester.tests_run} tests passed")
 
-    # Print final results
-    print("\n" + "=" * 60)
-    print(f"📊 Final Results: {tester.tests_passed}/{tester.tests_run} tests passed")
-    
     if tester.tests_passed == tester.tests_run:
-        print("🎉 All tests passed!")
+        log.info("🎉 All tests passed!")
         return 0
     else:
-        print(f"⚠️  {tester.tests_run - tester.tests_passed} tests failed")
+        log.warning(f"⚠️  {tester.tests_run - tester.tests_passed} tests failed")
         return 1
 
 if __name__ == "__main__":
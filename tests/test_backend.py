@@ -0,0 +1,48 @@
+import pytest
+import requests
+
+from backend_test import HealthScannerAPITester
+
+
+@pytest.fixture(scope='session')
+def api_client():
+    """One pre-warmed tester per pytest session.
+
+    DNS resolution and the TLS handshake are paid once when the tester is
+    constructed; every test in the session (and every repeated CI
+    invocation within it) then reuses the hot connection pool. With
+    pytest-xdist each worker process gets its own pooled session.
+    """
+    tester = HealthScannerAPITester()
+    try:
+        try:
+            tester.session.get(tester.base_url, timeout=5)
+        except requests.RequestException:
+            pytest.skip(f"Health Scanner API not reachable at {tester.base_url}")
+        yield tester
+    finally:
+        tester.close()
+
+
+def test_health_check(api_client):
+    assert api_client.test_health_check()
+
+
+def test_get_ingredients(api_client):
+    assert api_client.test_get_ingredients()
+
+
+def test_get_scans(api_client):
+    assert api_client.test_get_scans()
+
+
+def test_scan_image(api_client):
+    assert api_client.test_scan_image()
+
+
+def test_invalid_file_upload(api_client):
+    assert api_client.test_invalid_file_upload()
+
+
+def test_large_file_upload(api_client):
+    assert api_client.test_large_file_upload()